@@ -4,7 +4,8 @@ Windows-compatible version - saves files in the same folder as the script
 """
 
 import sys
-import os
+import math
+from pathlib import Path
 
 # Check for required packages
 required_packages = {
@@ -36,11 +37,395 @@ if missing_packages:
 # Now import everything
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from scipy.integrate import odeint
+from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
+from scipy.integrate import solve_ivp
+
+# numba is optional - without it the JIT-decorated helpers run as plain Python
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# numexpr is optional - it speeds up the RHS of large ensembles in the NumPy
+# fallback of solve_ensemble, which only runs when numba is not installed
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+# Below this ensemble size numexpr's per-call overhead outweighs its fused loops.
+# Only consulted by the no-numba ensemble path; with numba, _ensemble_rk4 is used
+NUMEXPR_MIN_SIZE = 16384
 
 print("✓ All packages loaded successfully!")
 
+# Shortest time between animation frames (50 fps); finer solutions are subsampled
+MIN_FRAME_INTERVAL = 0.02
+
+# Output files are saved next to the script (or the working directory when run interactively)
+SCRIPT_DIR = Path(__file__).resolve().parent if '__file__' in globals() else Path.cwd()
+
+@njit(cache=True, fastmath=True)
+def _accelerations(theta1, omega1, theta2, omega2, L1, L2, m1, m2, g):
+    """
+    Angular accelerations of the double pendulum, compiled with numba when available
+    Takes the state as four scalars so the compiled loops keep it in registers
+    Returns (domega1_dt, domega2_dt)
+    """
+    # Shared subexpressions - each trig term and product is evaluated once per call
+    delta = theta2 - theta1
+    sd = math.sin(delta)
+    cd = math.cos(delta)
+    sdcd = sd * cd
+    s1 = math.sin(theta1)
+    s2 = math.sin(theta2)
+    M = m1 + m2
+    Mg = M * g
+    w1sq = omega1 * omega1
+    w2sq = omega2 * omega2
+    
+    # Denominator terms
+    den1 = M * L1 - m2 * L1 * cd * cd
+    den2 = (L2 / L1) * den1
+    
+    # Angular acceleration equations
+    domega1_dt = ((m2 * L1 * w1sq * sdcd
+                   + m2 * g * s2 * cd
+                   + m2 * L2 * w2sq * sd
+                   - Mg * s1)
+                  / den1)
+    
+    domega2_dt = ((-m2 * L2 * w2sq * sdcd
+                   + Mg * s1 * cd
+                   - M * L1 * w1sq * sd
+                   - Mg * s2)
+                  / den2)
+    
+    return domega1_dt, domega2_dt
+
+@njit(cache=True, fastmath=True)
+def _rhs(state, t, L1, L2, m1, m2, g):
+    """
+    Equations of motion in (state, t) form, as used by derivatives()
+    state = [theta1, omega1, theta2, omega2]
+    Returns (dtheta1_dt, domega1_dt, dtheta2_dt, domega2_dt)
+    """
+    domega1_dt, domega2_dt = _accelerations(state[0], state[1], state[2], state[3],
+                                            L1, L2, m1, m2, g)
+    return state[1], domega1_dt, state[3], domega2_dt
+
+@njit(cache=True, fastmath=True)
+def _rhs_ivp(t, y, L1, L2, m1, m2, g):
+    """
+    Equations of motion in the (t, y) form solve_ivp expects, returned as an array
+    Passing this straight to solve_ivp keeps each callback a single call into
+    compiled code, with no Python method frame or tuple-to-array conversion
+    """
+    domega1_dt, domega2_dt = _accelerations(y[0], y[1], y[2], y[3], L1, L2, m1, m2, g)
+    dydt = np.empty(4)
+    dydt[0] = y[1]
+    dydt[1] = domega1_dt
+    dydt[2] = y[3]
+    dydt[3] = domega2_dt
+    return dydt
+
+@njit(cache=True, fastmath=True)
+def _jacobian_ivp(t, y, L1, L2, m1, m2, g):
+    """
+    _jacobian with the (t, y) argument order solve_ivp expects
+    """
+    return _jacobian(y, t, L1, L2, m1, m2, g)
+
+@njit(cache=True, fastmath=True)
+def _jacobian(state, t, L1, L2, m1, m2, g):
+    """
+    Analytic 4x4 Jacobian of _rhs with respect to [theta1, omega1, theta2, omega2]
+    Row i holds the partial derivatives of the i-th derivative
+    """
+    theta1 = state[0]
+    omega1 = state[1]
+    theta2 = state[2]
+    omega2 = state[3]
+    
+    delta = theta2 - theta1
+    sd = math.sin(delta)
+    cd = math.cos(delta)
+    s1 = math.sin(theta1)
+    s2 = math.sin(theta2)
+    c1 = math.cos(theta1)
+    c2 = math.cos(theta2)
+    sdcd = sd * cd
+    c2d = cd * cd - sd * sd  # cos(2*delta)
+    M = m1 + m2
+    Mg = M * g
+    w1sq = omega1 * omega1
+    w2sq = omega2 * omega2
+    
+    den1 = M * L1 - m2 * L1 * cd * cd
+    den2 = (L2 / L1) * den1
+    dden1 = 2 * m2 * L1 * sdcd  # d(den1)/d(delta)
+    dden2 = (L2 / L1) * dden1
+    
+    # Numerators and their derivatives with respect to delta
+    num1 = m2 * L1 * w1sq * sdcd + m2 * g * s2 * cd + m2 * L2 * w2sq * sd - Mg * s1
+    dnum1 = m2 * L1 * w1sq * c2d - m2 * g * s2 * sd + m2 * L2 * w2sq * cd
+    num2 = -m2 * L2 * w2sq * sdcd + Mg * s1 * cd - M * L1 * w1sq * sd - Mg * s2
+    dnum2 = -m2 * L2 * w2sq * c2d - Mg * s1 * sd - M * L1 * w1sq * cd
+    
+    # Quotient rule: d(num/den)/d(delta); delta enters with -1 for theta1, +1 for theta2
+    G1 = (dnum1 - num1 / den1 * dden1) / den1
+    G2 = (dnum2 - num2 / den2 * dden2) / den2
+    
+    jac = np.zeros((4, 4))
+    jac[0, 1] = 1.0
+    jac[2, 3] = 1.0
+    
+    jac[1, 0] = -Mg * c1 / den1 - G1
+    jac[1, 1] = 2 * m2 * L1 * omega1 * sdcd / den1
+    jac[1, 2] = m2 * g * c2 * cd / den1 + G1
+    jac[1, 3] = 2 * m2 * L2 * omega2 * sd / den1
+    
+    jac[3, 0] = Mg * c1 * cd / den2 - G2
+    jac[3, 1] = -2 * M * L1 * omega1 * sd / den2
+    jac[3, 2] = -Mg * c2 / den2 + G2
+    jac[3, 3] = -2 * m2 * L2 * omega2 * sdcd / den2
+    
+    return jac
+
+@njit(cache=True, fastmath=True)
+def _rk4_fill(out, y0, t, L1, L2, m1, m2, g):
+    """
+    Classic fixed-step 4th order Runge-Kutta over the time grid t
+    The whole loop runs compiled, with no Python callback per step
+    Writes the trajectory into out, an array of shape (len(t), 4)
+    """
+    # An empty grid (t_span <= 0) has no rows to fill
+    if len(t) == 0:
+        return
+    
+    theta1, omega1, theta2, omega2 = y0[0], y0[1], y0[2], y0[3]
+    out[0, 0] = theta1
+    out[0, 1] = omega1
+    out[0, 2] = theta2
+    out[0, 3] = omega2
+    
+    for i in range(1, len(t)):
+        h = t[i] - t[i - 1]
+        
+        a1, b1 = _accelerations(theta1, omega1, theta2, omega2, L1, L2, m1, m2, g)
+        
+        w1 = omega1 + 0.5 * h * a1
+        w2 = omega2 + 0.5 * h * b1
+        a2, b2 = _accelerations(theta1 + 0.5 * h * omega1, w1,
+                                theta2 + 0.5 * h * omega2, w2, L1, L2, m1, m2, g)
+        
+        v1 = omega1 + 0.5 * h * a2
+        v2 = omega2 + 0.5 * h * b2
+        a3, b3 = _accelerations(theta1 + 0.5 * h * w1, v1,
+                                theta2 + 0.5 * h * w2, v2, L1, L2, m1, m2, g)
+        
+        u1 = omega1 + h * a3
+        u2 = omega2 + h * b3
+        a4, b4 = _accelerations(theta1 + h * v1, u1,
+                                theta2 + h * v2, u2, L1, L2, m1, m2, g)
+        
+        theta1 += h * (omega1 + 2 * w1 + 2 * v1 + u1) / 6
+        theta2 += h * (omega2 + 2 * w2 + 2 * v2 + u2) / 6
+        omega1 += h * (a1 + 2 * a2 + 2 * a3 + a4) / 6
+        omega2 += h * (b1 + 2 * b2 + 2 * b3 + b4) / 6
+        
+        out[i, 0] = theta1
+        out[i, 1] = omega1
+        out[i, 2] = theta2
+        out[i, 3] = omega2
+
+@njit(cache=True, fastmath=True)
+def _integrate_rk4(y0, t, L1, L2, m1, m2, g):
+    """
+    Fixed-step RK4 for a single trajectory
+    Returns an array of shape (len(t), 4)
+    """
+    out = np.empty((len(t), 4))
+    _rk4_fill(out, y0, t, L1, L2, m1, m2, g)
+    return out
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _ensemble_rk4(y0, t, L1, L2, m1, m2, g):
+    """
+    Fixed-step RK4 for many trajectories, one per row of y0 (shape (N, 4))
+    Trajectories are independent, so prange spreads them over all cores;
+    each one keeps its state in four scalars
+    Returns an array of shape (N, len(t), 4)
+    """
+    out = np.empty((y0.shape[0], len(t), 4))
+    for n in prange(y0.shape[0]):
+        _rk4_fill(out[n], y0[n], t, L1, L2, m1, m2, g)
+    return out
+
+@njit(cache=True, fastmath=True)
+def _hamiltonian_gradient(theta1, theta2, p1, p2, L1, L2, m1, m2, g):
+    """
+    Partial derivatives of the double pendulum Hamiltonian H(theta, p)
+    p1, p2 are the generalized momenta conjugate to theta1, theta2
+    Returns (dH/dp1, dH/dp2, dH/dtheta1, dH/dtheta2) - the first two are omega1, omega2
+    """
+    # H = (d*p1^2 + a*p2^2 - 2*b*c*p1*p2) / (2*D) + V, with D = a*d - (b*c)^2
+    a = (m1 + m2) * L1 * L1
+    d = m2 * L2 * L2
+    b = m2 * L1 * L2
+    delta = theta1 - theta2
+    s = math.sin(delta)
+    bc = b * math.cos(delta)
+    D = a * d - bc * bc
+    
+    omega1 = (d * p1 - bc * p2) / D
+    omega2 = (a * p2 - bc * p1) / D
+    
+    # Derivative of the kinetic term with respect to delta
+    N = d * p1 * p1 + a * p2 * p2 - 2 * bc * p1 * p2
+    K = b * s * (p1 * p2 * D - N * bc) / (D * D)
+    
+    dH_dtheta1 = K + (m1 + m2) * g * L1 * math.sin(theta1)
+    dH_dtheta2 = -K + m2 * g * L2 * math.sin(theta2)
+    
+    return omega1, omega2, dH_dtheta1, dH_dtheta2
+
+@njit(cache=True, fastmath=True)
+def _verlet_step(theta1, theta2, p1, p2, h, L1, L2, m1, m2, g):
+    """
+    One Stormer-Verlet (generalized leapfrog) step: half kick, drift, half kick
+    H is not separable - the mass matrix depends on theta - so the first kick and
+    the drift are implicit and solved by fixed-point iteration
+    Returns (theta1, theta2, p1, p2, converged); converged is False when either
+    iteration did not settle, which happens when h is too large
+    """
+    tol = 1e-13
+    
+    # Half kick: p_half = p - h/2 * dH/dtheta(theta, p_half)
+    ph1, ph2 = p1, p2
+    kick_done = False
+    for _ in range(50):
+        _, _, f1, f2 = _hamiltonian_gradient(theta1, theta2, ph1, ph2, L1, L2, m1, m2, g)
+        n1 = p1 - 0.5 * h * f1
+        n2 = p2 - 0.5 * h * f2
+        kick_done = abs(n1 - ph1) + abs(n2 - ph2) < tol * (1 + abs(n1) + abs(n2))
+        ph1, ph2 = n1, n2
+        if kick_done:
+            break
+    if not kick_done:
+        return theta1, theta2, p1, p2, False
+    
+    # Drift: theta_new = theta + h/2 * (dH/dp(theta, p_half) + dH/dp(theta_new, p_half))
+    w1, w2, _, _ = _hamiltonian_gradient(theta1, theta2, ph1, ph2, L1, L2, m1, m2, g)
+    q1 = theta1 + h * w1
+    q2 = theta2 + h * w2
+    drift_done = False
+    for _ in range(50):
+        v1, v2, _, _ = _hamiltonian_gradient(q1, q2, ph1, ph2, L1, L2, m1, m2, g)
+        n1 = theta1 + 0.5 * h * (w1 + v1)
+        n2 = theta2 + 0.5 * h * (w2 + v2)
+        drift_done = abs(n1 - q1) + abs(n2 - q2) < tol * (1 + abs(n1) + abs(n2))
+        q1, q2 = n1, n2
+        if drift_done:
+            break
+    if not drift_done:
+        return theta1, theta2, p1, p2, False
+    
+    # Half kick: explicit, at the new angles
+    _, _, f1, f2 = _hamiltonian_gradient(q1, q2, ph1, ph2, L1, L2, m1, m2, g)
+    return q1, q2, ph1 - 0.5 * h * f1, ph2 - 0.5 * h * f2, True
+
+@njit(cache=True, fastmath=True)
+def _integrate_verlet(y0, t, L1, L2, m1, m2, g):
+    """
+    Symplectic integration over the time grid t in (theta, p) coordinates
+    Energy error stays bounded at O(dt^2) instead of drifting over long runs
+    Returns an array of shape (len(t), 4) in [theta1, omega1, theta2, omega2] form,
+    and the index of the first step whose implicit solve failed (-1 if none).
+    Rows from that step on are left unfilled
+    """
+    out = np.empty((len(t), 4))
+    # An empty grid (t_span <= 0) has no rows to fill
+    if len(t) == 0:
+        return out, -1
+    
+    theta1, omega1, theta2, omega2 = y0[0], y0[1], y0[2], y0[3]
+    out[0, 0] = theta1
+    out[0, 1] = omega1
+    out[0, 2] = theta2
+    out[0, 3] = omega2
+    
+    # Generalized momenta p = M(theta) @ omega
+    bc = m2 * L1 * L2 * math.cos(theta1 - theta2)
+    p1 = (m1 + m2) * L1 * L1 * omega1 + bc * omega2
+    p2 = m2 * L2 * L2 * omega2 + bc * omega1
+    
+    for i in range(1, len(t)):
+        theta1, theta2, p1, p2, converged = _verlet_step(theta1, theta2, p1, p2, t[i] - t[i - 1],
+                                                         L1, L2, m1, m2, g)
+        if not converged:
+            return out, i
+        omega1, omega2, _, _ = _hamiltonian_gradient(theta1, theta2, p1, p2, L1, L2, m1, m2, g)
+        
+        out[i, 0] = theta1
+        out[i, 1] = omega1
+        out[i, 2] = theta2
+        out[i, 3] = omega2
+    
+    return out, -1
+
+def _accelerations_array(theta1, omega1, theta2, omega2, L1, L2, m1, m2, g):
+    """
+    Vectorized twin of _accelerations for state arrays of shape (N,)
+    Each NumPy call advances every trajectory of an ensemble at once
+    Returns (domega1_dt, domega2_dt)
+    """
+    if ne is not None and np.size(theta1) >= NUMEXPR_MIN_SIZE:
+        # numexpr evaluates each expression in one blocked, SIMD and multithreaded
+        # pass, without the NumPy temporaries
+        local_dict = {'theta1': theta1, 'omega1': omega1, 'theta2': theta2, 'omega2': omega2,
+                      'L1': L1, 'L2': L2, 'm2': m2, 'M': m1 + m2, 'g': g}
+        local_dict['sd'] = ne.evaluate('sin(theta2 - theta1)', local_dict=local_dict)
+        local_dict['cd'] = ne.evaluate('cos(theta2 - theta1)', local_dict=local_dict)
+        local_dict['s1'] = ne.evaluate('sin(theta1)', local_dict=local_dict)
+        local_dict['s2'] = ne.evaluate('sin(theta2)', local_dict=local_dict)
+        local_dict['den1'] = ne.evaluate('M * L1 - m2 * L1 * cd * cd', local_dict=local_dict)
+        
+        domega1_dt = ne.evaluate('(m2 * L1 * omega1 * omega1 * sd * cd + m2 * g * s2 * cd'
+                                 ' + m2 * L2 * omega2 * omega2 * sd - M * g * s1) / den1',
+                                 local_dict=local_dict)
+        domega2_dt = ne.evaluate('(-m2 * L2 * omega2 * omega2 * sd * cd + M * g * s1 * cd'
+                                 ' - M * L1 * omega1 * omega1 * sd - M * g * s2)'
+                                 ' / ((L2 / L1) * den1)',
+                                 local_dict=local_dict)
+        return domega1_dt, domega2_dt
+    
+    delta = theta2 - theta1
+    sd = np.sin(delta)
+    cd = np.cos(delta)
+    sdcd = sd * cd
+    s1 = np.sin(theta1)
+    s2 = np.sin(theta2)
+    M = m1 + m2
+    Mg = M * g
+    w1sq = omega1 * omega1
+    w2sq = omega2 * omega2
+    
+    den1 = M * L1 - m2 * L1 * cd * cd
+    den2 = (L2 / L1) * den1
+    
+    domega1_dt = (m2 * L1 * w1sq * sdcd + m2 * g * s2 * cd + m2 * L2 * w2sq * sd - Mg * s1) / den1
+    domega2_dt = (-m2 * L2 * w2sq * sdcd + Mg * s1 * cd - M * L1 * w1sq * sd - Mg * s2) / den2
+    
+    return domega1_dt, domega2_dt
+
 class DoublePendulum:
     def __init__(self, L1=1.0, L2=1.0, m1=1.0, m2=1.0, g=9.81):
         """
@@ -62,75 +447,196 @@ class DoublePendulum:
         Calculate the derivatives for the double pendulum equations of motion
         state = [theta1, omega1, theta2, omega2]
         """
-        theta1, omega1, theta2, omega2 = state
-        
-        # Calculate the differences
-        delta = theta2 - theta1
+        state = np.asarray(state, dtype=float)
+        return list(_rhs(state, t, self.L1, self.L2, self.m1, self.m2, self.g))
+    
+    def derivatives_ivp(self, t, y):
+        """
+        Same as derivatives(), with the (t, y) argument order solve_ivp expects
+        """
+        y = np.asarray(y, dtype=float)
+        return _rhs_ivp(t, y, self.L1, self.L2, self.m1, self.m2, self.g)
+    
+    def jacobian(self, state, t):
+        """
+        Analytic Jacobian of derivatives() as a (4, 4) array
+        state = [theta1, omega1, theta2, omega2]
+        """
+        state = np.asarray(state, dtype=float)
+        return _jacobian(state, t, self.L1, self.L2, self.m1, self.m2, self.g)
+    
+    def solve(self, initial_state, t_span, dt=0.01, method='rk4'):
+        """
+        Solve the equations of motion
+        initial_state = [theta1_0, omega1_0, theta2_0, omega2_0]
+        method: 'rk4' for the compiled fixed-step Runge-Kutta loop (fast),
+                'symplectic' for a fixed-step Stormer-Verlet loop that keeps the
+                energy bounded over long runs,
+                or any solve_ivp method ('DOP853', 'RK45', 'LSODA', ...) for an
+                adaptive solver whose dense output is sampled every dt
+        """
+        t = np.arange(0, t_span, dt)
+        y0 = np.asarray(initial_state, dtype=float)
         
-        # Denominator terms
-        den1 = (self.m1 + self.m2) * self.L1 - self.m2 * self.L1 * np.cos(delta) * np.cos(delta)
-        den2 = (self.L2 / self.L1) * den1
+        # t_span <= 0 leaves nothing to integrate, whichever method is chosen
+        if len(t) == 0:
+            return t, np.empty((0, 4))
         
-        # Angular acceleration equations
-        dtheta1_dt = omega1
+        if method == 'rk4':
+            solution = _integrate_rk4(y0, t, self.L1, self.L2, self.m1, self.m2, self.g)
+        elif method == 'symplectic':
+            solution, failed_step = _integrate_verlet(y0, t, self.L1, self.L2,
+                                                      self.m1, self.m2, self.g)
+            if failed_step >= 0:
+                raise RuntimeError(f"Integration failed: the implicit Stormer-Verlet step did not "
+                                   f"converge at t={t[failed_step]:.3f}s with dt={dt}; "
+                                   f"use a smaller dt")
+        else:
+            # The adaptive solver picks its own steps, free of the output grid;
+            # the dense interpolant is evaluated on t afterwards
+            options = {}
+            if method in ('Radau', 'BDF', 'LSODA'):
+                # Implicit solvers would otherwise build the Jacobian by finite differences
+                options['jac'] = _jacobian_ivp
+            # The compiled callbacks go to solve_ivp directly, with the parameters as args
+            sol = solve_ivp(_rhs_ivp, (t[0], t[-1]), y0, method=method,
+                            args=(self.L1, self.L2, self.m1, self.m2, self.g),
+                            rtol=1e-8, atol=1e-10, dense_output=True, **options)
+            if not sol.success:
+                raise RuntimeError(f"Integration failed: {sol.message}")
+            solution = sol.sol(t).T
+        return t, solution
+    
+    def solve_ensemble(self, initial_states, t_span, dt=0.01):
+        """
+        Solve many trajectories at once with a fixed-step RK4
+        initial_states: array of shape (N, 4), one [theta1, omega1, theta2, omega2] per row
+        With numba the trajectories run in parallel across cores. Without it the
+        state is kept as four length-N arrays, so each step costs a fixed number
+        of NumPy calls regardless of N
+        Returns t and an array of shape (N, len(t), 4)
+        """
+        t = np.arange(0, t_span, dt)
+        states = np.asarray(initial_states, dtype=float)
+        params = (self.L1, self.L2, self.m1, self.m2, self.g)
         
-        domega1_dt = ((self.m2 * self.L1 * omega1 * omega1 * np.sin(delta) * np.cos(delta)
-                      + self.m2 * self.g * np.sin(theta2) * np.cos(delta)
-                      + self.m2 * self.L2 * omega2 * omega2 * np.sin(delta)
-                      - (self.m1 + self.m2) * self.g * np.sin(theta1))
-                     / den1)
+        if HAVE_NUMBA:
+            return t, _ensemble_rk4(states, t, *params)
         
-        dtheta2_dt = omega2
+        theta1, omega1, theta2, omega2 = (states[:, k].copy() for k in range(4))
+        out = np.empty((len(t), 4, len(states)))
+        out[0] = states.T
         
-        domega2_dt = ((-self.m2 * self.L2 * omega2 * omega2 * np.sin(delta) * np.cos(delta)
-                      + (self.m1 + self.m2) * self.g * np.sin(theta1) * np.cos(delta)
-                      - (self.m1 + self.m2) * self.L1 * omega1 * omega1 * np.sin(delta)
-                      - (self.m1 + self.m2) * self.g * np.sin(theta2))
-                     / den2)
+        for i in range(1, len(t)):
+            h = t[i] - t[i - 1]
+            
+            a1, b1 = _accelerations_array(theta1, omega1, theta2, omega2, *params)
+            
+            w1 = omega1 + 0.5 * h * a1
+            w2 = omega2 + 0.5 * h * b1
+            a2, b2 = _accelerations_array(theta1 + 0.5 * h * omega1, w1,
+                                          theta2 + 0.5 * h * omega2, w2, *params)
+            
+            v1 = omega1 + 0.5 * h * a2
+            v2 = omega2 + 0.5 * h * b2
+            a3, b3 = _accelerations_array(theta1 + 0.5 * h * w1, v1,
+                                          theta2 + 0.5 * h * w2, v2, *params)
+            
+            u1 = omega1 + h * a3
+            u2 = omega2 + h * b3
+            a4, b4 = _accelerations_array(theta1 + h * v1, u1,
+                                          theta2 + h * v2, u2, *params)
+            
+            theta1 += h * (omega1 + 2 * w1 + 2 * v1 + u1) / 6
+            theta2 += h * (omega2 + 2 * w2 + 2 * v2 + u2) / 6
+            omega1 += h * (a1 + 2 * a2 + 2 * a3 + a4) / 6
+            omega2 += h * (b1 + 2 * b2 + 2 * b3 + b4) / 6
+            
+            out[i, 0] = theta1
+            out[i, 1] = omega1
+            out[i, 2] = theta2
+            out[i, 3] = omega2
         
-        return [dtheta1_dt, domega1_dt, dtheta2_dt, domega2_dt]
+        return t, out.transpose(2, 0, 1)
     
-    def solve(self, initial_state, t_span, dt=0.01):
+    def energy(self, solution):
         """
-        Solve the equations of motion
-        initial_state = [theta1_0, omega1_0, theta2_0, omega2_0]
+        Total mechanical energy (kinetic + potential) for each row of a solution
+        solution: array of shape (..., 4) with [theta1, omega1, theta2, omega2] rows
         """
-        t = np.arange(0, t_span, dt)
-        solution = odeint(self.derivatives, initial_state, t)
-        return t, solution
+        solution = np.asarray(solution, dtype=float)
+        theta1, omega1, theta2, omega2 = (solution[..., k] for k in range(4))
+        M = self.m1 + self.m2
+        
+        kinetic = (0.5 * M * (self.L1 * omega1)**2 + 0.5 * self.m2 * (self.L2 * omega2)**2
+                   + self.m2 * self.L1 * self.L2 * omega1 * omega2 * np.cos(theta1 - theta2))
+        potential = -M * self.g * self.L1 * np.cos(theta1) - self.m2 * self.g * self.L2 * np.cos(theta2)
+        return kinetic + potential
+
+    def positions(self, theta1, theta2):
+        """
+        Cartesian positions of both bobs for arrays of angles
+        Each trig result is scaled and shifted in place, so only four arrays are allocated
+        Returns x1, y1, x2, y2
+        """
+        x1 = np.sin(theta1)
+        x1 *= self.L1
+        y1 = np.cos(theta1)
+        y1 *= -self.L1
+        
+        x2 = np.sin(theta2)
+        x2 *= self.L2
+        x2 += x1
+        y2 = np.cos(theta2)
+        y2 *= -self.L2
+        y2 += y1
+        
+        return x1, y1, x2, y2
 
-def create_animation(save_gif=True, output_filename='double_pendulum.gif'):
+def create_animation(pendulum, t, solution, save_gif=True, output_filename='double_pendulum.gif',
+                     save_mp4=False):
     """
     Create an animated visualization of the double pendulum
+    t, solution: output of pendulum.solve(), one animation frame per time step;
+                 steps finer than MIN_FRAME_INTERVAL are thinned out, and a
+                 subsampled solution can be passed to lower the frame rate further
+    save_gif: write output_filename as a GIF (slow to encode)
+    save_mp4: write an .mp4 with the same name (fast to encode, requires ffmpeg);
+              pass save_gif=False as well to skip the GIF entirely
     Saves to the current directory (same folder as the script)
     """
-    # Initialize the pendulum
-    pendulum = DoublePendulum(L1=1.0, L2=1.0, m1=1.0, m2=1.0)
+    if len(t) < 2:
+        raise ValueError("create_animation needs at least two time steps")
     
-    # Initial conditions: [theta1, omega1, theta2, omega2]
-    # Starting with both pendulums at interesting angles
-    initial_state = [np.pi/2, 0, np.pi/2 + 0.1, 0]
+    # Browsers stretch GIF frame delays under 20 ms to 100 ms, so cap the frame rate
+    # at 50 fps by keeping every n-th step of a finer solution
+    dt = t[1] - t[0]
+    if not dt > 0:
+        raise ValueError("create_animation needs increasing time steps")
+    frame_step = max(1, math.ceil(round(MIN_FRAME_INTERVAL / dt, 9)))
+    t = t[::frame_step]
+    solution = solution[::frame_step]
+    dt *= frame_step
     
-    # Solve the system
-    t_span = 20  # seconds
-    dt = 0.02
-    t, solution = pendulum.solve(initial_state, t_span, dt)
+    # Play back in real time: one saved frame per time step. Whole fps values keep
+    # the GIF frame delay from truncating to a shorter one (GIF counts in 10 ms units);
+    # steps of 2 s or more still play at 1 fps rather than rounding down to 0
+    fps = max(1, round(1 / dt))
     
     # Extract angles
     theta1 = solution[:, 0]
     theta2 = solution[:, 2]
     
     # Calculate positions
-    x1 = pendulum.L1 * np.sin(theta1)
-    y1 = -pendulum.L1 * np.cos(theta1)
-    
-    x2 = x1 + pendulum.L2 * np.sin(theta2)
-    y2 = y1 - pendulum.L2 * np.cos(theta2)
+    x1, y1, x2, y2 = pendulum.positions(theta1, theta2)
     
     # Set up the figure
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.set_xlim(-2.5, 2.5)
     ax.set_ylim(-2.5, 2.5)
+    # The limits are fixed, so skip autoscaling whenever the artists change
+    ax.set_autoscale_on(False)
+    ax.use_sticky_edges = False
     ax.set_aspect('equal')
     ax.grid(True, alpha=0.3)
     ax.set_facecolor('#f8f9fa')
@@ -144,8 +650,17 @@ def create_animation(save_gif=True, output_filename='double_pendulum.gif'):
                         fontsize=14, verticalalignment='top',
                         bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
     
-    # Store trace data
-    trace_x, trace_y = [], []
+    # Precompute everything animate() draws, so each frame only hands out views:
+    # the arm as (pivot, bob 1, bob 2) rows, and the time label strings
+    line_x = np.zeros((len(t), 3))
+    line_x[:, 1] = x1
+    line_x[:, 2] = x2
+    line_y = np.zeros((len(t), 3))
+    line_y[:, 1] = y1
+    line_y[:, 2] = y2
+    time_strs = [f'Time: {ti:.2f}s' for ti in t]
+    
+    # The trace is the most recent stretch of the second bob's path
     max_trace_length = 200
     
     def init():
@@ -156,23 +671,14 @@ def create_animation(save_gif=True, output_filename='double_pendulum.gif'):
     
     def animate(i):
         # Update pendulum positions
-        x_data = [0, x1[i], x2[i]]
-        y_data = [0, y1[i], y2[i]]
-        line.set_data(x_data, y_data)
+        line.set_data(line_x[i], line_y[i])
         
         # Update trace
-        trace_x.append(x2[i])
-        trace_y.append(y2[i])
-        
-        # Limit trace length
-        if len(trace_x) > max_trace_length:
-            trace_x.pop(0)
-            trace_y.pop(0)
-        
-        trace.set_data(trace_x, trace_y)
+        start = max(0, i + 1 - max_trace_length)
+        trace.set_data(x2[start:i + 1], y2[start:i + 1])
         
         # Update time
-        time_text.set_text(f'Time: {t[i]:.2f}s')
+        time_text.set_text(time_strs[i])
         
         return line, trace, time_text
     
@@ -186,33 +692,42 @@ def create_animation(save_gif=True, output_filename='double_pendulum.gif'):
     plt.xlabel('X Position (m)', fontsize=12)
     plt.ylabel('Y Position (m)', fontsize=12)
     
+    output_path = SCRIPT_DIR / output_filename
+    
     # Save as GIF (in current directory)
     if save_gif:
         try:
             print(f"Saving animation to '{output_filename}'... This may take a minute.")
-            # Get the directory where the script is located
-            script_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
-            output_path = os.path.join(script_dir, output_filename)
-            
-            anim.save(output_path, writer='pillow', fps=30, dpi=80)
+            # 72 dpi keeps the 10in figure at 720px, which is plenty for a GIF
+            anim.save(output_path, writer=PillowWriter(fps=fps), dpi=72)
             print(f"✓ Animation saved as '{output_path}'")
         except Exception as e:
             print(f"⚠ Could not save GIF: {e}")
             print("  Try: python -m pip install pillow")
     
+    # Save as MP4 - encodes several times faster than GIF but needs ffmpeg
+    if save_mp4:
+        mp4_path = output_path.with_suffix('.mp4')
+        if not FFMpegWriter.isAvailable():
+            print("⚠ Could not save MP4: ffmpeg was not found on the PATH")
+        else:
+            try:
+                print(f"Saving animation to '{mp4_path}'...")
+                writer = FFMpegWriter(fps=fps, bitrate=1800, codec='libx264')
+                anim.save(mp4_path, writer=writer, dpi=80)
+                print(f"✓ Animation saved as '{mp4_path}'")
+            except Exception as e:
+                print(f"⚠ Could not save MP4: {e}")
+    
     plt.tight_layout()
     return fig, anim
 
-def plot_energy_and_phase(output_filename='pendulum_analysis.png'):
+def plot_energy_and_phase(t, solution, output_filename='pendulum_analysis.png'):
     """
     Create additional plots showing energy and phase space
+    t, solution: output of DoublePendulum.solve()
     Saves to the current directory (same folder as the script)
     """
-    pendulum = DoublePendulum(L1=1.0, L2=1.0, m1=1.0, m2=1.0)
-    initial_state = [np.pi/2, 0, np.pi/2 + 0.1, 0]
-    
-    t, solution = pendulum.solve(initial_state, 20, 0.01)
-    
     theta1 = solution[:, 0]
     omega1 = solution[:, 1]
     theta2 = solution[:, 2]
@@ -261,17 +776,63 @@ def plot_energy_and_phase(output_filename='pendulum_analysis.png'):
     plt.tight_layout()
     
     try:
-        # Get the directory where the script is located
-        script_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
-        output_path = os.path.join(script_dir, output_filename)
-        
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        output_path = SCRIPT_DIR / output_filename
+        # tight_layout() already trimmed the margins; 120 dpi is plenty on screen
+        fig.savefig(output_path, dpi=120)
         print(f"✓ Analysis plots saved as '{output_path}'")
     except Exception as e:
         print(f"⚠ Could not save PNG: {e}")
     
     return fig
 
+def plot_chaos_divergence(pendulum, initial_state, t_span, dt=0.01,
+                          output_filename='pendulum_divergence.png', n_trajectories=200, spread=1e-4):
+    """
+    Solve an ensemble of nearly identical pendulums and plot how fast they separate
+    pendulum, initial_state, t_span, dt: the same setup as passed to pendulum.solve()
+    The starting angle of the second arm is varied by at most +/- spread radians
+    Saves to the current directory (same folder as the script)
+    """
+    initial_states = np.tile(np.asarray(initial_state, dtype=float), (n_trajectories, 1))
+    initial_states[:, 2] += np.linspace(-spread, spread, n_trajectories)
+    
+    t, solutions = pendulum.solve_ensemble(initial_states, t_span, dt)
+    
+    # Phase-space distance of every trajectory from the middle one
+    reference = solutions[n_trajectories // 2]
+    separation = np.linalg.norm(solutions - reference, axis=2)
+    median_separation = np.median(separation, axis=0)
+    
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    fig.suptitle(f'{n_trajectories} Pendulums Starting Within ±{spread:g} rad', 
+                 fontsize=16, fontweight='bold')
+    
+    # Second arm angle for every trajectory
+    axes[0].plot(t, np.rad2deg(solutions[:, :, 2].T), color='#FF6B6B', linewidth=0.5, alpha=0.2)
+    axes[0].set_xlabel('Time (s)', fontsize=11)
+    axes[0].set_ylabel('θ₂ (degrees)', fontsize=11)
+    axes[0].set_title('Second Pendulum Angle - Whole Ensemble', fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    
+    # Exponential growth of the separation shows up as a straight line on a log scale
+    axes[1].semilogy(t[1:], median_separation[1:], color='#2196F3', linewidth=2)
+    axes[1].set_xlabel('Time (s)', fontsize=11)
+    axes[1].set_ylabel('Median phase-space separation', fontsize=11)
+    axes[1].set_title('Divergence of Nearby Trajectories', fontweight='bold')
+    axes[1].grid(True, alpha=0.3, which='both')
+    
+    plt.tight_layout()
+    
+    try:
+        output_path = SCRIPT_DIR / output_filename
+        # tight_layout() already trimmed the margins; 120 dpi is plenty on screen
+        fig.savefig(output_path, dpi=120)
+        print(f"✓ Divergence plot saved as '{output_path}'")
+    except Exception as e:
+        print(f"⚠ Could not save PNG: {e}")
+    
+    return fig
+
 if __name__ == "__main__":
     print("=" * 60)
     print("DOUBLE INVERTED PENDULUM SIMULATION")
@@ -281,17 +842,41 @@ if __name__ == "__main__":
     print("\nGenerating animation and analysis plots...")
     print("-" * 60)
     
-    # Create the animation
-    fig_anim, anim = create_animation(save_gif=True)
+    # Initialize the pendulum
+    pendulum = DoublePendulum(L1=1.0, L2=1.0, m1=1.0, m2=1.0)
+    
+    # Initial conditions: [theta1, omega1, theta2, omega2]
+    # Starting with both pendulums at interesting angles
+    initial_state = [np.pi/2, 0, np.pi/2 + 0.1, 0]
+    
+    # Animation format: 'gif' (works everywhere, slow to export) or
+    # 'mp4' (exports several times faster, needs ffmpeg on the PATH)
+    video_format = 'gif'
+    
+    # Solve the system once; the animation and the plots share the result
+    t_span = 20  # seconds
+    dt = 0.01
+    t, solution = pendulum.solve(initial_state, t_span, dt)
+    
+    # Animate only the steps that will be shown, at roughly 30 frames per second
+    # (every 3rd step), instead of rendering frames the viewer never sees
+    frame_step = max(1, round(1 / (30 * dt)))
+    fig_anim, anim = create_animation(pendulum, t[::frame_step], solution[::frame_step],
+                                      save_gif=(video_format == 'gif'),
+                                      save_mp4=(video_format == 'mp4'))
+    
+    # Create analysis plots at full resolution
+    fig_analysis = plot_energy_and_phase(t, solution)
     
-    # Create analysis plots
-    fig_analysis = plot_energy_and_phase()
+    # Create the ensemble divergence plot
+    fig_divergence = plot_chaos_divergence(pendulum, initial_state, t_span, dt)
     
     print("-" * 60)
     print("\n✓ All visualizations created successfully!")
     print("\nFiles saved in the same folder as this script:")
-    print("  1. double_pendulum.gif - Animated simulation")
+    print(f"  1. double_pendulum.{video_format} - Animated simulation")
     print("  2. pendulum_analysis.png - Analysis plots")
+    print("  3. pendulum_divergence.png - Divergence of nearby trajectories")
     print("\nYou can now use these for your LinkedIn post!")
     print("=" * 60)
     